@@ -544,6 +544,7 @@ from open_webui.utils.oauth import (
 )
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.vmc_kernels import warmup as warmup_vmc_kernels
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -687,6 +688,9 @@ async def lifespan(app: FastAPI):
 
     asyncio.create_task(periodic_usage_pool_cleanup())
 
+    # Compile VMC kernels off the event loop so the first /play doesn't pay for JIT
+    asyncio.create_task(asyncio.to_thread(warmup_vmc_kernels))
+
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
         await get_all_models(
             Request(
@@ -4,21 +4,33 @@ VMC (Virtual Motion Capture) API router.
 Endpoints for recording, managing, and playing back VMC animation presets.
 """
 
+import asyncio
 import logging
+import zlib
 
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from pydantic import BaseModel
 
 from open_webui.utils.auth import get_verified_user
 from open_webui.utils.vmc import (
+    BLENDSHAPE_ORDER,
+    VMCPlayer,
+    VMCRecorder,
+    VMCSender,
     get_sender,
     get_recorder,
     get_player,
     save_preset,
     load_preset,
+    load_preset_path,
+    load_preset_relative,
+    read_preset_bytes,
+    PRESET_SUFFIX,
     list_presets,
     delete_preset,
-    convert_to_relative,
     get_rest_pose,
     set_rest_pose,
     reset_rest_pose,
@@ -33,7 +45,52 @@ from open_webui.utils.vmc_emotion import (
 from open_webui.utils.vmc_presets import generate_starter_presets
 
 log = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Serialize the idempotent installers so concurrent calls can't both miss the
+# "already exists" check and duplicate work (or double-insert the filter)
+_install_lock = asyncio.Lock()
+_generate_lock = asyncio.Lock()
+
+
+def _json_response(content) -> Response:
+    """Serialize with orjson directly, bypassing FastAPI's jsonable_encoder pass."""
+    return Response(content=orjson.dumps(content), media_type="application/json")
+
+
+def _etag_response(request: Request, content: dict) -> Response:
+    """JSON response with a weak ETag over *content*; 304 if the client has it.
+
+    Meant for small, frequently polled status payloads.  ``no-cache`` makes
+    browsers revalidate every poll instead of serving a stale status.
+    """
+    etag = f'W/"{zlib.crc32(repr(tuple(content.values())).encode()):08x}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match == "*" or etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    response = _json_response(content)
+    response.headers.update(headers)
+    return response
+
+
+def _accepts_encoding(request: Request, coding: str) -> bool:
+    """True if Accept-Encoding allows *coding* with q > 0 (``*`` as fallback)."""
+    qvalues = {}
+    for item in request.headers.get("accept-encoding", "").lower().split(","):
+        token, *params = (part.strip() for part in item.split(";"))
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[token] = q
+    return qvalues.get(coding, qvalues.get("*", 0.0)) > 0
 
 
 # ── Models ────────────────────────────────────────────────────────────────
@@ -52,13 +109,20 @@ class BlendshapeRequest(BaseModel):
     blendshapes: dict[str, float]
 
 
+class BlendshapeArrayRequest(BaseModel):
+    """Blendshape values packed in BLENDSHAPE_ORDER (see GET /blendshapes/order)."""
+
+    values: list[float]
+
+
 # ── Recording ─────────────────────────────────────────────────────────────
 
 
 @router.post("/record/start")
-async def start_recording(user=Depends(get_verified_user)):
+async def start_recording(
+    recorder: VMCRecorder = Depends(get_recorder), user=Depends(get_verified_user)
+):
     """Start the VMC recorder (begins capturing from VSeeFace)."""
-    recorder = get_recorder()
     if recorder.is_recording:
         raise HTTPException(status_code=409, detail="Already recording")
     recorder.start_server()  # idempotent — no-op if already running
@@ -67,11 +131,12 @@ async def start_recording(user=Depends(get_verified_user)):
 
 
 @router.post("/record/stop")
-async def stop_recording(
-    request: PresetNameRequest, user=Depends(get_verified_user)
+def stop_recording(
+    request: PresetNameRequest,
+    recorder: VMCRecorder = Depends(get_recorder),
+    user=Depends(get_verified_user),
 ):
     """Stop recording and save as a named preset."""
-    recorder = get_recorder()
     if not recorder.is_recording:
         raise HTTPException(status_code=409, detail="Not recording")
 
@@ -87,50 +152,80 @@ async def stop_recording(
 
     save_preset(name, frames)
 
-    bones_in_frames = sum(1 for f in frames if "bones" in f)
-    max_bones = max((len(f.get("bones", {})) for f in frames), default=0)
+    # Single pass over frames for the bone summary
+    bones_in_frames = 0
+    max_bones = 0
+    for f in frames:
+        b = f.get("bones")
+        if b is not None:
+            bones_in_frames += 1
+            if len(b) > max_bones:
+                max_bones = len(b)
+
+    duration_ms = frames[-1]["t"]
 
     return {
         "status": "saved",
         "name": name,
         "frame_count": len(frames),
-        "duration_ms": frames[-1]["t"] if frames else 0,
+        "duration_ms": duration_ms,
         "bone_frames": bones_in_frames,
         "bone_count": max_bones,
     }
 
 
-@router.get("/record/status")
-async def recording_status(user=Depends(get_verified_user)):
+@router.get("/record/status", response_model=None, response_class=Response)
+async def recording_status(
+    request: Request,
+    recorder: VMCRecorder = Depends(get_recorder),
+    user=Depends(get_verified_user),
+):
     """Check if recording is active."""
-    recorder = get_recorder()
-    return {
-        "recording": recorder.is_recording,
-        "frame_count": recorder.frame_count,
-        "bone_count": recorder.bone_count,
-    }
+    return _etag_response(
+        request,
+        {
+            "recording": recorder.is_recording,
+            "frame_count": recorder.frame_count,
+            "bone_count": recorder.bone_count,
+        },
+    )
 
 
 # ── Presets ───────────────────────────────────────────────────────────────
 
 
-@router.get("/presets")
-async def get_presets(user=Depends(get_verified_user)):
+@router.get("/presets", response_model=None, response_class=Response)
+def get_presets(user=Depends(get_verified_user)):
     """List all saved animation presets."""
-    return list_presets()
+    return _json_response(list_presets())
+
 
+@router.get("/presets/{name}", response_model=None, response_class=Response)
+def get_preset(name: str, request: Request, user=Depends(get_verified_user)):
+    """Get a specific preset's full data (streamed straight from disk).
 
-@router.get("/presets/{name}")
-async def get_preset(name: str, user=Depends(get_verified_user)):
-    """Get a specific preset's full data."""
+    Compressed presets are sent as-is with ``Content-Encoding: zstd`` when
+    the client accepts it, and decompressed server-side otherwise.
+    """
     try:
-        return load_preset(name)
+        path = load_preset_path(name)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Preset '{name}' not found")
 
+    if not path.name.endswith(PRESET_SUFFIX):
+        return FileResponse(path, media_type="application/json")
+
+    headers = {"Vary": "Accept-Encoding"}
+    if _accepts_encoding(request, "zstd"):
+        headers["Content-Encoding"] = "zstd"
+        return FileResponse(path, media_type="application/json", headers=headers)
+    return Response(
+        content=read_preset_bytes(path), media_type="application/json", headers=headers
+    )
+
 
 @router.delete("/presets/{name}")
-async def remove_preset(name: str, user=Depends(get_verified_user)):
+def remove_preset(name: str, user=Depends(get_verified_user)):
     """Delete a preset."""
     if not delete_preset(name):
         raise HTTPException(status_code=404, detail=f"Preset '{name}' not found")
@@ -141,23 +236,20 @@ async def remove_preset(name: str, user=Depends(get_verified_user)):
 
 
 @router.post("/play")
-async def play_preset(request: PlayRequest, user=Depends(get_verified_user)):
+def play_preset(
+    request: PlayRequest,
+    player: VMCPlayer = Depends(get_player),
+    user=Depends(get_verified_user),
+):
     """Play a saved preset as an action (layered on top of idle)."""
     try:
-        preset = load_preset(request.name)
+        # Absolute presets come back converted to relative deltas (cached)
+        frames = load_preset_relative(request.name)
     except FileNotFoundError:
         raise HTTPException(
             status_code=404, detail=f"Preset '{request.name}' not found"
         )
 
-    frames = preset["frames"]
-    mode = preset.get("mode", "absolute")
-
-    # Absolute presets need to be converted to relative deltas for actions
-    if mode == "absolute":
-        frames = convert_to_relative(frames)
-
-    player = get_player()
     player.play_action(frames, loop=request.loop)
     return {
         "status": "playing",
@@ -167,25 +259,33 @@ async def play_preset(request: PlayRequest, user=Depends(get_verified_user)):
 
 
 @router.post("/play/stop")
-async def stop_playback(user=Depends(get_verified_user)):
+async def stop_playback(
+    player: VMCPlayer = Depends(get_player), user=Depends(get_verified_user)
+):
     """Stop current action playback (idle continues)."""
-    player = get_player()
     player.stop_action()
     return {"status": "stopped"}
 
 
-@router.get("/play/status")
-async def playback_status(user=Depends(get_verified_user)):
+@router.get("/play/status", response_model=None, response_class=Response)
+async def playback_status(
+    request: Request,
+    player: VMCPlayer = Depends(get_player),
+    user=Depends(get_verified_user),
+):
     """Check if an animation is currently playing."""
-    player = get_player()
-    return {"playing": player.is_playing}
+    return _etag_response(request, {"playing": player.is_playing})
 
 
 # ── Idle ──────────────────────────────────────────────────────────────────
 
 
 @router.post("/idle/set")
-async def set_idle(request: PresetNameRequest, user=Depends(get_verified_user)):
+def set_idle(
+    request: PresetNameRequest,
+    player: VMCPlayer = Depends(get_player),
+    user=Depends(get_verified_user),
+):
     """Set a preset as the continuous idle animation (replaces T-pose)."""
     try:
         preset = load_preset(request.name)
@@ -194,43 +294,52 @@ async def set_idle(request: PresetNameRequest, user=Depends(get_verified_user)):
             status_code=404, detail=f"Preset '{request.name}' not found"
         )
 
-    player = get_player()
     player.set_idle(preset["frames"], name=request.name)
     return {"status": "idle_started", "name": request.name}
 
 
 @router.post("/idle/stop")
-async def stop_idle(user=Depends(get_verified_user)):
+async def stop_idle(
+    player: VMCPlayer = Depends(get_player), user=Depends(get_verified_user)
+):
     """Stop the idle loop and send a neutral reset."""
-    player = get_player()
     player.stop_idle()
     return {"status": "idle_stopped"}
 
 
-@router.get("/idle/status")
-async def idle_status(user=Depends(get_verified_user)):
+@router.get("/idle/status", response_model=None, response_class=Response)
+async def idle_status(
+    request: Request,
+    player: VMCPlayer = Depends(get_player),
+    user=Depends(get_verified_user),
+):
     """Check idle animation state."""
-    player = get_player()
-    return {
-        "active": player.is_idle_active,
-        "name": player.idle_name,
-    }
+    return _etag_response(
+        request,
+        {
+            "active": player.is_idle_active,
+            "name": player.idle_name,
+        },
+    )
 
 
 # ── Direct blendshape control ────────────────────────────────────────
 
 
 @router.post("/rest-pose/apply")
-async def apply_rest_pose_endpoint(user=Depends(get_verified_user)):
+async def apply_rest_pose_endpoint(
+    sender: VMCSender = Depends(get_sender), user=Depends(get_verified_user)
+):
     """Send the rest pose once to VSeeFace (quick T-pose fix)."""
-    apply_rest_pose()
+    apply_rest_pose(sender)
     return {"status": "applied"}
 
 
 @router.post("/rest-pose/capture")
-async def capture_rest_pose(user=Depends(get_verified_user)):
+def capture_rest_pose(
+    recorder: VMCRecorder = Depends(get_recorder), user=Depends(get_verified_user)
+):
     """Capture VSeeFace's current bone state as the rest pose."""
-    recorder = get_recorder()
     recorder.start_server()
     state = recorder.get_current_state()
     bones = state.get("bones", {})
@@ -239,34 +348,63 @@ async def capture_rest_pose(user=Depends(get_verified_user)):
             status_code=400,
             detail="No bone data received from VSeeFace. Make sure VMC sending is enabled.",
         )
-    set_rest_pose(bones)
+    try:
+        set_rest_pose(bones)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"status": "captured", "bone_count": len(bones)}
 
 
 @router.post("/rest-pose/reset")
-async def reset_rest_pose_endpoint(user=Depends(get_verified_user)):
+def reset_rest_pose_endpoint(user=Depends(get_verified_user)):
     """Reset rest pose to the default arms-down values."""
     reset_rest_pose()
     return {"status": "reset"}
 
 
-@router.get("/rest-pose")
+@router.get("/rest-pose", response_model=None, response_class=Response)
 async def get_rest_pose_endpoint(user=Depends(get_verified_user)):
     """Get the current rest pose bone data."""
     pose = get_rest_pose()
-    return {"bone_count": len(pose), "bones": list(pose.keys())}
+    return _json_response({"bone_count": len(pose), "bones": list(pose.keys())})
 
 
 @router.post("/blendshapes")
 async def send_blendshapes(
-    request: BlendshapeRequest, user=Depends(get_verified_user)
+    request: BlendshapeRequest,
+    background_tasks: BackgroundTasks,
+    sender: VMCSender = Depends(get_sender),
+    user=Depends(get_verified_user),
 ):
     """Send blendshape values directly to VSeeFace (for testing)."""
-    sender = get_sender()
-    sender.send_blendshapes(request.blendshapes)
+    # Fire-and-forget: the UDP send happens after the response goes out
+    background_tasks.add_task(sender.send_blendshapes, request.blendshapes)
     return {"status": "sent", "count": len(request.blendshapes)}
 
 
+@router.post("/blendshapes/array")
+async def send_blendshape_array(
+    request: BlendshapeArrayRequest,
+    background_tasks: BackgroundTasks,
+    sender: VMCSender = Depends(get_sender),
+    user=Depends(get_verified_user),
+):
+    """Send a packed blendshape value array (indexed by BLENDSHAPE_ORDER)."""
+    if len(request.values) > len(BLENDSHAPE_ORDER):
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {len(BLENDSHAPE_ORDER)} values are accepted",
+        )
+    background_tasks.add_task(sender.send_blendshape_values, request.values)
+    return {"status": "sent", "count": len(request.values)}
+
+
+@router.get("/blendshapes/order")
+async def get_blendshape_order(user=Depends(get_verified_user)):
+    """Get the blendshape name order used by /blendshapes/array."""
+    return list(BLENDSHAPE_ORDER)
+
+
 # ── Emotion filter ───────────────────────────────────────────────────────
 
 
@@ -284,16 +422,17 @@ async def detect_emotion_endpoint(
     return {"emotion": emotion, "preset": preset}
 
 
-@router.get("/emotion/mappings")
+@router.get("/emotion/mappings", response_model=None, response_class=Response)
 async def get_emotion_mappings(user=Depends(get_verified_user)):
     """Get the current emotion → preset mapping table."""
-    return EMOTION_PRESET_MAP
+    return _json_response(EMOTION_PRESET_MAP)
 
 
 @router.post("/emotion/filter/install")
 async def install_emotion_filter(user=Depends(get_verified_user)):
     """Install the VMC emotion trigger as a global filter function."""
-    created = install_filter(user.id)
+    async with _install_lock:
+        created = await run_in_threadpool(install_filter, user.id)
     if created:
         return {"status": "installed", "id": "vmc_emotion_trigger"}
     return {"status": "already_installed", "id": "vmc_emotion_trigger"}
@@ -305,5 +444,6 @@ async def install_emotion_filter(user=Depends(get_verified_user)):
 @router.post("/presets/generate")
 async def generate_presets(user=Depends(get_verified_user)):
     """Generate all synthetic starter presets (smile, nod, etc.)."""
-    created = generate_starter_presets(overwrite=False)
+    async with _generate_lock:
+        created = await run_in_threadpool(generate_starter_presets, overwrite=False)
     return {"status": "ok", "created": created, "count": len(created)}
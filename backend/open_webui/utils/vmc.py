@@ -12,47 +12,71 @@ VSeeFace defaults:
 VMC Protocol reference: https://protocol.vmc.info/
 """
 
-import json
 import math
+from bisect import bisect_right
+import os
+import socket
+import struct
+import sys
 import time
+from collections import deque
+from functools import lru_cache
 import threading
 import logging
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Optional
 
-from pythonosc import udp_client, osc_server, dispatcher
+import numpy as np
+import orjson
+import zstandard as zstd
+from pythonosc import osc_server, dispatcher
 
 from open_webui.env import DATA_DIR
+from open_webui.utils.vmc_kernels import relative_rotations
 
 
 # ── Quaternion helpers ───────────────────────────────────────────────────
 
+_IDENTITY = (0.0, 0.0, 0.0, 1.0)
+
+
 def _quat_identity() -> list[float]:
     return [0.0, 0.0, 0.0, 1.0]
 
 
-def _quat_multiply(a: list[float], b: list[float]) -> list[float]:
-    """Hamilton product: a * b. Format [x, y, z, w]."""
-    ax, ay, az, aw = a
-    bx, by, bz, bw = b
+def _quat_rotate_vec3(q: list[float], v: list[float]) -> list[float]:
+    """Rotate vector *v* by unit quaternion *q* ([x, y, z, w]).
+
+    Uses v' = v + w*t + u x t with t = 2 * (u x v), u = q.xyz — two cross
+    products instead of the two Hamilton products of q * v * q^-1.
+    """
+    qx, qy, qz, qw = q
+    vx, vy, vz = v
+    tx = 2.0 * (qy * vz - qz * vy)
+    ty = 2.0 * (qz * vx - qx * vz)
+    tz = 2.0 * (qx * vy - qy * vx)
     return [
-        aw * bx + ax * bw + ay * bz - az * by,
-        aw * by - ax * bz + ay * bw + az * bx,
-        aw * bz + ax * by - ay * bx + az * bw,
-        aw * bw - ax * bx - ay * by - az * bz,
+        vx + qw * tx + (qy * tz - qz * ty),
+        vy + qw * ty + (qz * tx - qx * tz),
+        vz + qw * tz + (qx * ty - qy * tx),
     ]
 
 
-def _quat_inverse(q: list[float]) -> list[float]:
-    """Inverse of a unit quaternion (conjugate). Format [x, y, z, w]."""
-    return [-q[0], -q[1], -q[2], q[3]]
-
+def _paired_rotations(a_bones: dict, b_bones: dict):
+    """Yield (name, a_rot, b_rot) over the union of two bone dicts.
 
-def _quat_normalize(q: list[float]) -> list[float]:
-    mag = math.sqrt(sum(c * c for c in q))
-    if mag < 1e-10:
-        return _quat_identity()
-    return [c / mag for c in q]
+    Walks each dict once instead of building a union set and doing two
+    lookups per name; a bone missing on either side is the identity.
+    """
+    for name, data in a_bones.items():
+        b = b_bones.get(name)
+        yield name, data.get("rot", _IDENTITY), (
+            b.get("rot", _IDENTITY) if b is not None else _IDENTITY
+        )
+    for name, data in b_bones.items():
+        if name not in a_bones:
+            yield name, _IDENTITY, data.get("rot", _IDENTITY)
 
 
 # ── Blendshape clamping / eye-conflict resolution ────────────────────────
@@ -63,7 +87,6 @@ _EYE_BLINK_NAMES = frozenset({
     "EyeBlinkLeft", "EyeBlinkRight",
     "eyeBlinkLeft", "eyeBlinkRight",
 })
-_EXPRESSIONS_AFFECTING_EYES = frozenset({"Joy", "Angry"})
 
 
 def _clamp_blendshapes(bs: dict[str, float]) -> dict[str, float]:
@@ -74,18 +97,24 @@ def _clamp_blendshapes(bs: dict[str, float]) -> dict[str, float]:
     combined effect can exceed 1.0 and poke geometry through the mesh.
     This helper caps eye-blink values so the total stays within limits.
     """
+    # Fast path: nothing to clamp and no expression strong enough to cap
+    # blinks — return the input as-is instead of building a copy.
+    for v in bs.values():
+        if not 0.0 <= v <= 1.0:
+            break
+    else:
+        if bs.get("Joy", 0.0) <= 0.05 and bs.get("Angry", 0.0) <= 0.05:
+            return bs
+
     result = {k: max(0.0, min(1.0, v)) for k, v in bs.items()}
 
-    expr_eye = max(
-        (result.get(n, 0.0) for n in _EXPRESSIONS_AFFECTING_EYES),
-        default=0.0,
-    )
+    # Joy and Angry are the expressions that close the eyes
+    expr_eye = max(result.get("Joy", 0.0), result.get("Angry", 0.0))
     if expr_eye > 0.05:
         # Assume expressions close eyes at ~70% of their value
         cap = max(0.0, 1.0 - expr_eye * 0.7)
-        for name in _EYE_BLINK_NAMES:
-            if name in result:
-                result[name] = min(result[name], cap)
+        for name in _EYE_BLINK_NAMES & result.keys():
+            result[name] = min(result[name], cap)
     return result
 
 
@@ -96,8 +125,33 @@ VMC_RECV_PORT = 39539  # We listen here (VSeeFace sends to us)
 VMC_SEND_PORT = 39540  # We send here (VSeeFace listens)
 VMC_SEND_HOST = "127.0.0.1"
 
+# Canonical blendshape order for packed value arrays (VRM 0.x preset names
+# as used by VSeeFace, plus "Surprised" used by the starter presets)
+BLENDSHAPE_ORDER: tuple[str, ...] = (
+    "Neutral",
+    "A",
+    "I",
+    "U",
+    "E",
+    "O",
+    "Blink",
+    "Blink_L",
+    "Blink_R",
+    "Joy",
+    "Angry",
+    "Sorrow",
+    "Fun",
+    "Surprised",
+    "LookUp",
+    "LookDown",
+    "LookLeft",
+    "LookRight",
+)
+
 # Presets directory (inside DATA_DIR so it won't trigger Vite/uvicorn reload)
 PRESETS_DIR = DATA_DIR / "vmc_presets"
+# Derived data (e.g. relative-converted frames), safe to delete at any time
+PRESETS_CACHE_DIR = PRESETS_DIR / ".cache"
 
 
 # ── Rest pose (arms-down baseline) ───────────────────────────────────────
@@ -114,18 +168,39 @@ _DEFAULT_REST_POSE: dict[str, dict] = {
 }
 
 _rest_pose: dict[str, dict] = {}
+# (name, float (rx, ry, rz, rw), encoded Bone/Pos message), Hips excluded.
+# Rebuilt whenever the pose changes, so sending it is a plain byte copy.
+_rest_pose_bones: tuple[tuple[str, tuple, bytes], ...] = ()
+
+
+def _set_rest_pose(pose: dict[str, dict]):
+    global _rest_pose, _rest_pose_bones
+    bones = []
+    for name, data in pose.items():
+        if name == "Hips":
+            continue
+        rot = _float_rot(data)
+        bones.append((name, rot, _bone_message(name, rot)))
+    # Assign both together so a malformed pose leaves the old one intact
+    _rest_pose, _rest_pose_bones = pose, tuple(bones)
 
 
 def _load_rest_pose():
-    global _rest_pose
     if _REST_POSE_PATH.exists():
         try:
-            _rest_pose = json.loads(_REST_POSE_PATH.read_text(encoding="utf-8"))
+            _set_rest_pose(orjson.loads(_REST_POSE_PATH.read_bytes()))
             log.info(f"Loaded custom rest pose ({len(_rest_pose)} bones)")
             return
-        except (json.JSONDecodeError, KeyError):
-            pass
-    _rest_pose = {k: dict(v) for k, v in _DEFAULT_REST_POSE.items()}
+        except (
+            orjson.JSONDecodeError,
+            KeyError,
+            ValueError,
+            TypeError,
+            AttributeError,
+            struct.error,
+        ) as e:
+            log.warning(f"Ignoring malformed rest pose file: {e}")
+    _set_rest_pose({k: dict(v) for k, v in _DEFAULT_REST_POSE.items()})
 
 
 def get_rest_pose() -> dict[str, dict]:
@@ -135,91 +210,206 @@ def get_rest_pose() -> dict[str, dict]:
     return _rest_pose
 
 
+def get_rest_pose_bones() -> tuple[tuple[str, tuple, bytes], ...]:
+    """Rest-pose bones as (name, float quaternion, OSC message), Hips excluded."""
+    if not _rest_pose:
+        _load_rest_pose()
+    return _rest_pose_bones
+
+
 def set_rest_pose(bones: dict[str, dict]):
-    """Set a custom rest pose from captured bone data and persist it."""
-    global _rest_pose
-    _rest_pose = {k: v for k, v in bones.items() if k != "Hips"}
+    """Set a custom rest pose from captured bone data and persist it.
+
+    Entries are validated and copied in a single pass, so the stored pose
+    never aliases the caller's dicts and always holds plain float lists.
+    Raises ValueError on malformed bone data.
+    """
+    pose: dict[str, dict] = {}
+    for name, data in bones.items():
+        if name == "Hips":
+            continue
+        pos = data.get("pos", (0.0, 0.0, 0.0))
+        rot = data.get("rot", (0.0, 0.0, 0.0, 1.0))
+        if len(pos) != 3 or len(rot) != 4:
+            raise ValueError(f"Malformed bone data for '{name}'")
+        pose[name] = {"pos": list(map(float, pos)), "rot": list(map(float, rot))}
+    _set_rest_pose(pose)
     _REST_POSE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    _REST_POSE_PATH.write_text(
-        json.dumps(_rest_pose, ensure_ascii=False, indent=2), encoding="utf-8"
+    _atomic_write_bytes(
+        _REST_POSE_PATH, orjson.dumps(_rest_pose, option=orjson.OPT_INDENT_2)
     )
     log.info(f"Rest pose saved ({len(_rest_pose)} bones)")
 
 
 def reset_rest_pose():
     """Reset rest pose to the default arms-down values."""
-    global _rest_pose
-    _rest_pose = {k: dict(v) for k, v in _DEFAULT_REST_POSE.items()}
+    _set_rest_pose({k: dict(v) for k, v in _DEFAULT_REST_POSE.items()})
     if _REST_POSE_PATH.exists():
         _REST_POSE_PATH.unlink()
     log.info("Rest pose reset to default")
 
 
-def apply_rest_pose():
+def apply_rest_pose(sender: Optional["VMCSender"] = None):
     """Send the rest pose bones once to VSeeFace (quick T-pose fix)."""
-    sender = get_sender()
-    sender._ensure_client()
-    for name, data in get_rest_pose().items():
-        if name == "Hips":
-            continue
-        r = data.get("rot", [0, 0, 0, 1])
-        sender._client.send_message(
-            "/VMC/Ext/Bone/Pos",
-            [name, 0.0, 0.0, 0.0] + [float(v) for v in r],
-        )
+    messages = [msg for _, _, msg in get_rest_pose_bones()]
+    if sender is None:
+        sender = get_sender()
+    sender.send_messages(messages)
+    # Bones were changed behind send_frame's back
+    sender.force_full_frame()
     log.info("Rest pose applied to VSeeFace")
 
 
+def _float_rot(data: dict) -> tuple:
+    return tuple(float(v) for v in data.get("rot", _IDENTITY))
+
+
+# ── OSC bundling ─────────────────────────────────────────────────────────
+
+# Keep each datagram under a typical Ethernet MTU so bundles are never
+# IP-fragmented (losing one fragment would drop the whole bundle).
+OSC_MAX_DATAGRAM = 1400
+# "#bundle\0" + time tag 1 ("immediately")
+_OSC_BUNDLE_HEADER = b"#bundle\x00" + struct.pack(">Q", 1)
+
+
+# The VMC messages sent per frame have fixed shapes, so they are packed
+# directly with struct (same bytes as OscMessageBuilder) instead of going
+# through the builder's per-argument type inference.
+@lru_cache(maxsize=512)
+def _osc_string(value: str) -> bytes:
+    """OSC string: UTF-8, NUL-terminated, padded to a multiple of 4 bytes."""
+    data = value.encode("utf-8")
+    return data + b"\x00" * (4 - len(data) % 4)
+
+
+_BLEND_VAL_PREFIX = _osc_string("/VMC/Ext/Blend/Val") + _osc_string(",sf")
+_BONE_POS_PREFIX = _osc_string("/VMC/Ext/Bone/Pos") + _osc_string(",sfffffff")
+_BLEND_APPLY_MESSAGE = _osc_string("/VMC/Ext/Blend/Apply") + _osc_string(",")
+_PACK_F = struct.Struct(">f").pack
+_PACK_7F = struct.Struct(">7f").pack
+
+
+def _blend_message(name: str, value: float) -> bytes:
+    """/VMC/Ext/Blend/Val <name> <value>"""
+    return _BLEND_VAL_PREFIX + _osc_string(name) + _PACK_F(value)
+
+
+def _bone_pos_message(name: str, pos, rot) -> bytes:
+    """/VMC/Ext/Bone/Pos <name> <px> <py> <pz> <rx> <ry> <rz> <rw>"""
+    return _BONE_POS_PREFIX + _osc_string(name) + _PACK_7F(*pos, *rot)
+
+
+def _bone_message(name: str, rot: tuple) -> bytes:
+    """/VMC/Ext/Bone/Pos with zero position (only rotations are sent)."""
+    return _BONE_POS_PREFIX + _osc_string(name) + _PACK_7F(0.0, 0.0, 0.0, *rot)
+
+
+def _osc_bundles(messages: list[bytes]):
+    """Pack encoded messages, in order, into as few bundles as fit the MTU."""
+    parts = [_OSC_BUNDLE_HEADER]
+    size = len(_OSC_BUNDLE_HEADER)
+    for msg in messages:
+        n = 4 + len(msg)
+        if len(parts) > 1 and size + n > OSC_MAX_DATAGRAM:
+            yield b"".join(parts)
+            parts = [_OSC_BUNDLE_HEADER]
+            size = len(_OSC_BUNDLE_HEADER)
+        parts.append(struct.pack(">i", len(msg)))
+        parts.append(msg)
+        size += n
+    if len(parts) > 1:
+        yield b"".join(parts)
+
+
 class VMCSender:
-    """Sends VMC/OSC messages to VSeeFace."""
+    """Sends VMC/OSC messages to VSeeFace.
+
+    send_frame only transmits values that moved since they were last sent
+    (VSeeFace holds the last value it received).  Every FULL_FRAME_INTERVAL
+    frames everything is re-sent so a dropped datagram or a restarted
+    receiver cannot leave stale state behind for long.
+    """
+
+    BLENDSHAPE_EPSILON = 1 / 1024
+    ROT_EPSILON = 1e-4
+    FULL_FRAME_INTERVAL = 30  # frames (~1 s at the player's 30 fps)
 
     def __init__(self, host: str = VMC_SEND_HOST, port: int = VMC_SEND_PORT):
         self.host = host
         self.port = port
-        self._client: Optional[udp_client.SimpleUDPClient] = None
-
-    def _ensure_client(self):
-        if self._client is None:
-            self._client = udp_client.SimpleUDPClient(self.host, self.port)
+        # Datagrams are packed by hand, so a plain UDP socket is all we need
+        self._sock: Optional[socket.socket] = None
+        # Last values put on the wire by send_frame
+        self._last_sent_bs: dict[str, float] = {}
+        self._last_sent_bone: dict[str, tuple] = {}
+        self._frames_since_full = 0
+
+    def _ensure_socket(self) -> socket.socket:
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        return self._sock
+
+    def force_full_frame(self):
+        """Make the next send_frame transmit every value (e.g. after the
+        receiver reconnected or state was changed outside send_frame)."""
+        self._last_sent_bs.clear()
+        self._last_sent_bone.clear()
 
     def send_blendshape(self, name: str, value: float):
         """Send a single blendshape value (0.0–1.0)."""
-        self._ensure_client()
+        self._last_sent_bs.pop(name, None)
         # VMC protocol: /VMC/Ext/Blend/Val <string name> <float value>
-        self._client.send_message("/VMC/Ext/Blend/Val", [name, float(value)])
+        self._ensure_socket().sendto(
+            _blend_message(name, float(value)), (self.host, self.port)
+        )
 
     def send_blendshape_apply(self):
         """Signal VSeeFace to apply all pending blendshape changes."""
-        self._ensure_client()
-        self._client.send_message("/VMC/Ext/Blend/Apply", [])
+        self._ensure_socket().sendto(_BLEND_APPLY_MESSAGE, (self.host, self.port))
+
+    def send_messages(self, messages: list[bytes]):
+        """Send encoded OSC messages as bundles — one datagram per ~MTU.
+
+        Order is preserved across datagrams, so a Blend/Apply still lands
+        after the values it applies.
+        """
+        sock = self._ensure_socket()
+        addr = (self.host, self.port)
+        for dgram in _osc_bundles(messages):
+            sock.sendto(dgram, addr)
 
     def send_blendshapes(self, blendshapes: dict[str, float]):
         """Send multiple blendshapes and apply them atomically."""
-        self._ensure_client()
         clamped = _clamp_blendshapes(blendshapes)
-        for name, value in clamped.items():
-            self._client.send_message("/VMC/Ext/Blend/Val", [name, float(value)])
-        self._client.send_message("/VMC/Ext/Blend/Apply", [])
+        for name in clamped:
+            self._last_sent_bs.pop(name, None)
+        messages = [_blend_message(name, value) for name, value in clamped.items()]
+        messages.append(_BLEND_APPLY_MESSAGE)
+        self.send_messages(messages)
+
+    def send_blendshape_values(self, values: list[float]):
+        """Send a packed value array, indexed by BLENDSHAPE_ORDER.
+
+        Shorter arrays cover a prefix of the order; missing names are
+        left untouched on the receiver.
+        """
+        self.send_blendshapes(dict(zip(BLENDSHAPE_ORDER, values)))
 
     def send_bone(self, name: str, pos: list[float], rot: list[float]):
         """Send a bone position + rotation (quaternion xyzw)."""
-        self._ensure_client()
-        # /VMC/Ext/Bone/Pos <name> <px> <py> <pz> <rx> <ry> <rz> <rw>
-        self._client.send_message(
-            "/VMC/Ext/Bone/Pos",
-            [name] + [float(v) for v in pos] + [float(v) for v in rot],
-        )
+        self._last_sent_bone.pop(name, None)
+        self.send_messages([_bone_pos_message(name, pos, rot)])
 
     def send_bones(self, bones: dict[str, dict]):
         """Send multiple bones. Each value: {"pos": [x,y,z], "rot": [x,y,z,w]}."""
-        self._ensure_client()
+        messages = []
         for name, data in bones.items():
+            self._last_sent_bone.pop(name, None)
             p = data.get("pos", [0, 0, 0])
             r = data.get("rot", [0, 0, 0, 1])
-            self._client.send_message(
-                "/VMC/Ext/Bone/Pos",
-                [name] + [float(v) for v in p] + [float(v) for v in r],
-            )
+            messages.append(_bone_pos_message(name, p, r))
+        self.send_messages(messages)
 
     def send_frame(self, frame: dict, include_bones: bool = False):
         """Send a complete frame (blendshapes + rest-pose bones).
@@ -230,32 +420,87 @@ class VMCSender:
 
         The Hips bone is always skipped to prevent teleportation.
         Bone positions are sent as zero — only rotations matter.
+
+        The whole frame goes out as OSC bundles (usually one or two
+        datagrams) instead of one datagram per message.  Values within
+        epsilon of what was last sent are skipped; Blend/Apply is always
+        sent.
         """
+        self._frames_since_full += 1
+        if self._frames_since_full >= self.FULL_FRAME_INTERVAL:
+            self.force_full_frame()
+            self._frames_since_full = 0
+
         bs = _clamp_blendshapes(frame.get("blendshapes", {}))
-        self._ensure_client()
+        last_bs = self._last_sent_bs
+        bs_eps = self.BLENDSHAPE_EPSILON
+        messages = []
         for name, value in bs.items():
-            self._client.send_message("/VMC/Ext/Blend/Val", [name, float(value)])
-        self._client.send_message("/VMC/Ext/Blend/Apply", [])
+            value = float(value)
+            prev = last_bs.get(name)
+            if prev is not None and abs(value - prev) < bs_eps:
+                continue
+            last_bs[name] = value
+            messages.append(_blend_message(name, value))
+        messages.append(_BLEND_APPLY_MESSAGE)
 
         # Always send rest-pose bones; frame bones override when present
-        merged_bones = dict(get_rest_pose())
-        if include_bones:
-            merged_bones.update(frame.get("bones", {}))
-        for name, data in merged_bones.items():
-            if name == "Hips":
-                continue
-            r = data.get("rot", [0, 0, 0, 1])
-            self._client.send_message(
-                "/VMC/Ext/Bone/Pos",
-                [name, 0.0, 0.0, 0.0] + [float(v) for v in r],
+        frame_bones = frame.get("bones", {}) if include_bones else {}
+        if frame_bones:
+            rest = get_rest_pose()
+            bones = []
+            for entry in get_rest_pose_bones():
+                data = frame_bones.get(entry[0])
+                if data is not None:
+                    entry = (entry[0], _float_rot(data), None)
+                bones.append(entry)
+            bones.extend(
+                (name, _float_rot(data), None)
+                for name, data in frame_bones.items()
+                if name not in rest and name != "Hips"
             )
+        else:
+            bones = get_rest_pose_bones()
+        last_bone = self._last_sent_bone
+        rot_eps = self.ROT_EPSILON
+        for name, rot, msg in bones:
+            rx, ry, rz, rw = rot
+            prev = last_bone.get(name)
+            if prev is not None and (
+                abs(rx - prev[0]) < rot_eps
+                and abs(ry - prev[1]) < rot_eps
+                and abs(rz - prev[2]) < rot_eps
+                and abs(rw - prev[3]) < rot_eps
+            ):
+                continue
+            last_bone[name] = rot
+            # Unoverridden rest-pose bones come pre-encoded
+            messages.append(msg or _bone_message(name, rot))
+        self.send_messages(messages)
 
     def close(self):
-        self._client = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        self.force_full_frame()
 
 
 class VMCRecorder:
-    """Records incoming VMC/OSC data from VSeeFace into keyframe files."""
+    """Records incoming VMC/OSC data from VSeeFace into keyframe files.
+
+    The live blendshape/bone dicts are copy-on-write: a snapshot (recorded
+    frame or get_current_state) references them directly and marks them
+    shared, and the next write that actually changes a value replaces the
+    dict instead of mutating it.  Per-bone {"pos", "rot"} entries are
+    never mutated once stored, so they are shared between snapshots too.
+
+    Blend/Val and Bone/Pos handlers only append to a deque; the queued
+    values are applied in one locked pass on Blend/Apply (when the state
+    is read, or once INBOX_SIZE messages pile up), so the OSC thread takes the lock once per frame
+    instead of once per message.
+    """
+
+    INBOX_SIZE = 4096
 
     def __init__(self, listen_port: int = VMC_RECV_PORT):
         self.listen_port = listen_port
@@ -266,6 +511,10 @@ class VMCRecorder:
         self._frames: list[dict] = []
         self._current_blendshapes: dict[str, float] = {}
         self._current_bones: dict[str, dict] = {}
+        self._bs_shared = False
+        self._bones_shared = False
+        # (is_bone, args) from the OSC handlers; deque appends are atomic
+        self._inbox: deque[tuple[bool, tuple]] = deque()
         self._lock = threading.Lock()
         self._sample_interval = 1.0 / 30  # 30 fps capture
         self._last_sample_time = 0.0
@@ -273,39 +522,69 @@ class VMCRecorder:
     def _on_blendshape(self, address: str, *args):
         """Handle /VMC/Ext/Blend/Val messages."""
         if len(args) >= 2:
-            name, value = str(args[0]), float(args[1])
-            with self._lock:
-                self._current_blendshapes[name] = value
+            self._inbox.append((False, args))
+            self._drain_if_full()
 
     def _on_bone(self, address: str, *args):
         """Handle /VMC/Ext/Bone/Pos messages."""
         if len(args) >= 8:
-            name = str(args[0])
+            self._inbox.append((True, args))
+            self._drain_if_full()
+
+    def _drain_if_full(self):
+        # Keeps the inbox bounded for senders that never emit Blend/Apply
+        if len(self._inbox) >= self.INBOX_SIZE:
+            with self._lock:
+                self._drain_inbox()
+
+    def _drain_inbox(self):
+        """Apply queued Blend/Val and Bone/Pos values. Caller holds _lock."""
+        inbox = self._inbox
+        for _ in range(len(inbox)):
+            is_bone, args = inbox.popleft()
+            # python-osc decodes a fresh str per message; interning makes
+            # every later dict lookup on the name an identity hit.
+            name = sys.intern(str(args[0]))
+            if not is_bone:
+                value = float(args[1])
+                # VSeeFace resends every value each frame; skip the no-ops
+                # so a shared snapshot is only copied on real changes.
+                if self._current_blendshapes.get(name) == value:
+                    continue
+                if self._bs_shared:
+                    self._current_blendshapes = dict(self._current_blendshapes)
+                    self._bs_shared = False
+                self._current_blendshapes[name] = value
+                continue
             pos = [float(args[1]), float(args[2]), float(args[3])]
             rot = [float(args[4]), float(args[5]), float(args[6]), float(args[7])]
-            with self._lock:
-                was_empty = len(self._current_bones) == 0
-                self._current_bones[name] = {"pos": pos, "rot": rot}
-                if was_empty:
-                    log.info(f"VMC first bone received: {name}")
+            prev = self._current_bones.get(name)
+            if prev is not None and prev["rot"] == rot and prev["pos"] == pos:
+                continue
+            was_empty = len(self._current_bones) == 0
+            if self._bones_shared:
+                self._current_bones = dict(self._current_bones)
+                self._bones_shared = False
+            self._current_bones[name] = {"pos": pos, "rot": rot}
+            if was_empty:
+                log.info(f"VMC first bone received: {name}")
 
     def _on_blendshape_apply(self, address: str, *args):
         """Handle /VMC/Ext/Blend/Apply — snapshot the current state as a frame."""
-        if not self._recording:
-            return
-
         now = time.perf_counter()
-        if now - self._last_sample_time < self._sample_interval:
-            return
-
         with self._lock:
+            self._drain_inbox()
+            if not self._recording:
+                return
+            if now - self._last_sample_time < self._sample_interval:
+                return
+
             t_ms = int((now - self._start_time) * 1000)
-            frame = {
-                "t": t_ms,
-                "blendshapes": dict(self._current_blendshapes),
-            }
+            frame = {"t": t_ms, "blendshapes": self._current_blendshapes}
+            self._bs_shared = True
             if self._current_bones:
-                frame["bones"] = {k: dict(v) for k, v in self._current_bones.items()}
+                frame["bones"] = self._current_bones
+                self._bones_shared = True
             self._frames.append(frame)
             self._last_sample_time = now
 
@@ -339,8 +618,11 @@ class VMCRecorder:
         """Begin capturing frames."""
         with self._lock:
             self._frames = []
+            self._inbox.clear()
             self._current_blendshapes = {}
             self._current_bones = {}
+            self._bs_shared = False
+            self._bones_shared = False
             self._start_time = time.perf_counter()
             self._last_sample_time = 0.0
             self._recording = True
@@ -355,11 +637,18 @@ class VMCRecorder:
         return frames
 
     def get_current_state(self) -> dict:
-        """Snapshot the latest blendshape/bone values from VSeeFace."""
+        """Snapshot the latest blendshape/bone values from VSeeFace.
+
+        The returned dicts are shared with the recorder; treat them as
+        read-only.
+        """
         with self._lock:
-            state: dict = {"blendshapes": dict(self._current_blendshapes)}
+            self._drain_inbox()
+            state: dict = {"blendshapes": self._current_blendshapes}
+            self._bs_shared = True
             if self._current_bones:
-                state["bones"] = {k: dict(v) for k, v in self._current_bones.items()}
+                state["bones"] = self._current_bones
+                self._bones_shared = True
             return state
 
     @property
@@ -373,12 +662,45 @@ class VMCRecorder:
     @property
     def bone_count(self) -> int:
         """Number of distinct bones currently being tracked."""
-        return len(self._current_bones)
+        with self._lock:
+            self._drain_inbox()
+            return len(self._current_bones)
 
     @property
     def bone_names(self) -> list[str]:
         """Names of bones currently being tracked."""
-        return list(self._current_bones.keys())
+        with self._lock:
+            self._drain_inbox()
+            return list(self._current_bones.keys())
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class _Action:
+    """One playing action layer (compared by identity)."""
+
+    frames: tuple[dict, ...]
+    ts: tuple[float, ...]  # frame timestamps for _find_frame_index
+    loop: bool
+    epoch: float  # perf_counter() when the action started
+
+
+@dataclass(frozen=True, slots=True)
+class PlayerState:
+    """Everything the render loop reads, as one immutable snapshot.
+
+    Mutators build a new state and swap the reference under a short lock;
+    the render thread just reads ``self._state`` once per tick.
+    """
+
+    idle_frames: tuple[dict, ...] = ()
+    idle_ts: tuple[float, ...] = ()
+    idle_active: bool = False
+    idle_name: str = ""
+    # Multiple actions can play simultaneously (layered on top of each other)
+    actions: tuple[_Action, ...] = ()
+    # Blendshape/bone names touched by any action, for clean reset
+    dirty_bs: frozenset[str] = field(default_factory=frozenset)
+    dirty_bones: frozenset[str] = field(default_factory=frozenset)
 
 
 class VMCPlayer:
@@ -396,48 +718,50 @@ class VMCPlayer:
 
     RENDER_FPS = 30
     CROSSFADE_MS = 500  # ms to blend at idle loop boundary
+    # Keep bone positions when merging layers (idle pos + action pos delta
+    # rotated into the idle bone's frame) instead of zeroing them.  Off by
+    # default; send_frame still puts zero positions on the wire.
+    MERGE_POSITIONS = False
 
     def __init__(self, sender: VMCSender):
         self.sender = sender
+        # Serializes state swaps; never held while rendering
         self._lock = threading.Lock()
         self._thread: Optional[threading.Thread] = None
         self._running = False
-
-        # Idle state
-        self._idle_frames: list[dict] = []
-        self._idle_active = False
-        self._idle_name = ""
-
-        # Active actions: list of {frames, loop, start_time}
-        # Multiple actions can play simultaneously (layered on top of each other)
-        self._active_actions: list[dict] = []
-        # Track blendshape/bone names touched by any action for clean reset
-        self._dirty_blendshapes: set[str] = set()
-        self._dirty_bones: set[str] = set()
+        # Set by stop() to wake the render loop out of its frame wait
+        self._stop_event = threading.Event()
+        self._state = PlayerState()
+        # Last sampled frame index per idle/action — render thread only
+        self._cursors: dict[int, int] = {}
 
     # ── Public API ────────────────────────────────────────────────────
 
     def set_idle(self, frames: list[dict], name: str = ""):
         """Set and start looping idle animation (absolute frames)."""
+        frames = tuple(frames)
         with self._lock:
-            self._idle_frames = list(frames)
-            self._idle_active = True
-            self._idle_name = name
+            self._state = replace(
+                self._state,
+                idle_frames=frames,
+                idle_ts=tuple(f["t"] for f in frames),
+                idle_active=True,
+                idle_name=name,
+            )
         self._ensure_thread()
 
     def stop_idle(self):
         """Stop the idle loop."""
         with self._lock:
-            self._idle_active = False
-            self._idle_name = ""
+            self._state = replace(self._state, idle_active=False, idle_name="")
 
     @property
     def idle_name(self) -> str:
-        return self._idle_name
+        return self._state.idle_name
 
     @property
     def is_idle_active(self) -> bool:
-        return self._idle_active
+        return self._state.idle_active
 
     def play_action(self, frames: list[dict], loop: bool = False):
         """Add a new action to play on top of existing actions.
@@ -445,17 +769,27 @@ class VMCPlayer:
         Multiple actions can play simultaneously. They layer on top of
         each other and the idle animation. Each action runs independently.
         """
+        frames = tuple(frames)
+        # Track dirty names for cleanup when all actions finish
+        bs_names: set[str] = set()
+        bone_names: set[str] = set()
+        for f in frames:
+            bs_names.update(f.get("blendshapes", {}).keys())
+            bone_names.update(f.get("bones", {}).keys())
+        action = _Action(
+            frames=frames,
+            ts=tuple(f["t"] for f in frames),
+            loop=loop,
+            epoch=time.perf_counter(),
+        )
         with self._lock:
-            action = {
-                "frames": list(frames),
-                "loop": loop,
-                "start_time": time.perf_counter(),
-            }
-            self._active_actions.append(action)
-            # Track dirty names for cleanup when all actions finish
-            for f in frames:
-                self._dirty_blendshapes.update(f.get("blendshapes", {}).keys())
-                self._dirty_bones.update(f.get("bones", {}).keys())
+            state = self._state
+            self._state = replace(
+                state,
+                actions=state.actions + (action,),
+                dirty_bs=state.dirty_bs | bs_names,
+                dirty_bones=state.dirty_bones | bone_names,
+            )
         self._ensure_thread()
 
     def play(self, frames: list[dict], loop: bool = False):
@@ -465,11 +799,15 @@ class VMCPlayer:
     def stop(self):
         """Stop all playback (idle + all actions) and send neutral reset."""
         with self._lock:
-            self._idle_active = False
-            self._active_actions.clear()
-            self._dirty_blendshapes.clear()
-            self._dirty_bones.clear()
+            self._state = replace(
+                self._state,
+                idle_active=False,
+                actions=(),
+                dirty_bs=frozenset(),
+                dirty_bones=frozenset(),
+            )
         self._running = False
+        self._stop_event.set()
         if self._thread:
             self._thread.join(timeout=2)
             self._thread = None
@@ -477,11 +815,12 @@ class VMCPlayer:
     def stop_action(self):
         """Stop all currently playing actions; idle continues."""
         with self._lock:
-            self._active_actions.clear()
+            self._state = replace(self._state, actions=())
 
     @property
     def is_playing(self) -> bool:
-        return self._idle_active or bool(self._active_actions)
+        state = self._state
+        return state.idle_active or bool(state.actions)
 
     # ── Internal ──────────────────────────────────────────────────────
 
@@ -492,37 +831,45 @@ class VMCPlayer:
             self._thread.join(timeout=1)
             self._thread = None
         self._running = True
+        self._stop_event.clear()
         self._thread = threading.Thread(target=self._render_loop, daemon=True)
         self._thread.start()
 
     def _send_reset(self):
         """Send neutral blendshapes to clear any lingering VSeeFace state."""
-        names: set[str] = set(self._dirty_blendshapes)
-        for action in self._active_actions:
-            for f in action["frames"]:
+        with self._lock:
+            state = self._state
+            self._state = replace(state, dirty_bs=frozenset(), dirty_bones=frozenset())
+        names: set[str] = set(state.dirty_bs)
+        for action in state.actions:
+            for f in action.frames:
                 names.update(f.get("blendshapes", {}).keys())
-        for f in self._idle_frames:
+        for f in state.idle_frames:
             names.update(f.get("blendshapes", {}).keys())
         if names:
             self.sender.send_frame(
                 {"blendshapes": {n: 0.0 for n in names}},
                 include_bones=False,
             )
-        self._dirty_blendshapes.clear()
-        self._dirty_bones.clear()
 
     # ── Frame helpers ─────────────────────────────────────────────────
 
     @staticmethod
-    def _find_frame(frames: list[dict], target_ms: float) -> dict:
-        """Nearest frame at or before *target_ms*."""
-        best = frames[0]
-        for f in frames:
-            if f["t"] <= target_ms:
-                best = f
-            else:
-                break
-        return best
+    def _find_frame_index(ts: list[float], target_ms: float, hint: int = 0) -> int:
+        """Index of the nearest frame at or before *target_ms*.
+
+        Playback time only moves forward between loop restarts, so start
+        from *hint* (the index sampled last tick) and step ahead a few
+        slots; fall back to a binary search after a restart or a stall.
+        """
+        n = len(ts)
+        if hint < n and ts[hint] <= target_ms:
+            i, stop = hint, min(hint + 4, n - 1)
+            while i < stop and ts[i + 1] <= target_ms:
+                i += 1
+            if i == n - 1 or ts[i + 1] > target_ms:
+                return i
+        return max(bisect_right(ts, target_ms) - 1, 0)
 
     @staticmethod
     def _blend_frames(a: dict, b: dict, t: float) -> dict:
@@ -532,35 +879,45 @@ class VMCPlayer:
         # Blendshapes
         a_bs = a.get("blendshapes", {})
         b_bs = b.get("blendshapes", {})
-        result["blendshapes"] = {}
-        for name in set(a_bs) | set(b_bs):
-            va = a_bs.get(name, 0.0)
+        blended = result["blendshapes"] = {}
+        for name, va in a_bs.items():
             vb = b_bs.get(name, 0.0)
-            result["blendshapes"][name] = va + (vb - va) * t
+            blended[name] = va + (vb - va) * t
+        for name, vb in b_bs.items():
+            if name not in a_bs:
+                blended[name] = 0.0 + vb * t
 
-        # Bones (rotation nlerp only — positions zeroed)
+        # Bones (rotation nlerp only — positions zeroed).  The quaternion
+        # math is inlined: this runs per bone on every crossfade tick.
         a_bones = a.get("bones", {})
         b_bones = b.get("bones", {})
         if a_bones or b_bones:
-            result["bones"] = {}
-            for name in set(a_bones) | set(b_bones):
-                ar = a_bones.get(name, {}).get("rot", [0, 0, 0, 1])
-                br = b_bones.get(name, {}).get("rot", [0, 0, 0, 1])
+            bones = result["bones"] = {}
+            for name, ar, br in _paired_rotations(a_bones, b_bones):
+                ax, ay, az, aw = ar
+                bx, by, bz, bw = br
                 # Quaternion hemisphere check for shortest-path nlerp
-                if sum(ar[i] * br[i] for i in range(4)) < 0:
-                    br = [-c for c in br]
-                result["bones"][name] = {
+                if ax * bx + ay * by + az * bz + aw * bw < 0:
+                    bx, by, bz, bw = -bx, -by, -bz, -bw
+                x = ax + (bx - ax) * t
+                y = ay + (by - ay) * t
+                z = az + (bz - az) * t
+                w = aw + (bw - aw) * t
+                mag = math.sqrt(x * x + y * y + z * z + w * w)
+                bones[name] = {
                     "pos": [0.0, 0.0, 0.0],
-                    "rot": _quat_normalize(
-                        [ar[i] + (br[i] - ar[i]) * t for i in range(4)]
+                    "rot": (
+                        [x / mag, y / mag, z / mag, w / mag]
+                        if mag >= 1e-10
+                        else _quat_identity()
                     ),
                 }
         return result
 
     # ── Layer sampling ────────────────────────────────────────────────
 
-    def _get_idle_frame(self, elapsed_s: float) -> Optional[dict]:
-        frames = self._idle_frames
+    def _get_idle_frame(self, state: PlayerState, elapsed_s: float) -> Optional[dict]:
+        frames = state.idle_frames
         if not frames:
             return None
         duration_ms = frames[-1]["t"]
@@ -568,7 +925,12 @@ class VMCPlayer:
             return dict(frames[0])
 
         elapsed_ms = (elapsed_s * 1000) % duration_ms
-        current = self._find_frame(frames, elapsed_ms)
+        key = id(frames)
+        cursor = self._find_frame_index(
+            state.idle_ts, elapsed_ms, self._cursors.get(key, 0)
+        )
+        self._cursors[key] = cursor
+        current = frames[cursor]
 
         # Crossfade near loop boundary
         cf_ms = min(self.CROSSFADE_MS, duration_ms * 0.3)
@@ -577,42 +939,48 @@ class VMCPlayer:
             current = self._blend_frames(current, frames[0], blend)
         return current
 
-    def _get_active_action_frames(self) -> list[dict]:
-        """Get current frame from each active action, remove expired ones.
+    def _get_active_action_frames(
+        self, state: PlayerState, now: float
+    ) -> tuple[list[dict], list[_Action]]:
+        """Sample the current frame of each action in *state*.
 
-        Actions that have finished (non-looping) are removed from the list.
-        Looping actions restart.  Returns list of current frames to merge.
+        Returns (frames to merge, finished non-looping actions).  Looping
+        actions wrap around their duration, measured from their epoch.
         """
         active_frames = []
-        expired_indices = []
+        expired = []
 
-        for i, action in enumerate(self._active_actions):
-            frames = action["frames"]
+        for action in state.actions:
+            frames = action.frames
             if not frames:
                 continue
 
-            elapsed_ms = (time.perf_counter() - action["start_time"]) * 1000
+            elapsed_ms = (now - action.epoch) * 1000
             duration_ms = frames[-1]["t"]
 
             if elapsed_ms >= duration_ms:
-                if action["loop"]:
-                    # Restart the loop (but keep in the list)
-                    action["start_time"] = time.perf_counter()
-                    elapsed_ms = 0.0
-                else:
-                    # Mark for removal
-                    expired_indices.append(i)
+                if not action.loop:
+                    expired.append(action)
                     continue
+                elapsed_ms = elapsed_ms % duration_ms if duration_ms > 0 else 0.0
 
             # Get frame at current time
-            frame = self._find_frame(frames, elapsed_ms)
-            active_frames.append(frame)
+            key = id(action)
+            cursor = self._find_frame_index(
+                action.ts, elapsed_ms, self._cursors.get(key, 0)
+            )
+            self._cursors[key] = cursor
+            active_frames.append(frames[cursor])
 
-        # Remove expired actions (in reverse to avoid index issues)
-        for i in reversed(expired_indices):
-            self._active_actions.pop(i)
+        return active_frames, expired
 
-        return active_frames
+    def _drop_actions(self, expired: list[_Action]):
+        """Remove finished actions from the current state."""
+        with self._lock:
+            state = self._state
+            self._state = replace(
+                state, actions=tuple(a for a in state.actions if a not in expired)
+            )
 
     # ── Layer merging ─────────────────────────────────────────────────
 
@@ -628,18 +996,88 @@ class VMCPlayer:
         if not action_frames:
             return idle
 
-        # Start with idle or empty
-        result = dict(idle) if idle else {}
+        layers = [f for f in action_frames if f]
+        if len(layers) < 2 or self.MERGE_POSITIONS:
+            # Start with idle or empty
+            result = dict(idle) if idle else {}
+
+            # Merge each action frame on top (in order)
+            for action_frame in layers:
+                result = self._merge_layers(result, action_frame, self.MERGE_POSITIONS)
+
+            return result
+
+        # Two or more layers: same result as chaining _merge_layers, but
+        # each name walks all layers in one go, so no per-layer frame
+        # dicts are built in between.
+        if not idle:
+            idle, layers = layers[0], layers[1:]
+            if len(layers) == 1:
+                return self._merge_layers(idle, layers[0])
+        return self._merge_layer_stack(idle, layers)
+
+    @staticmethod
+    def _merge_layer_stack(idle: dict, layers: list[dict]) -> dict:
+        """_merge_layers folded over *layers* (rotations only).
+
+        Clamping and normalization still happen after every layer, in the
+        same order, so the output matches the chained merge exactly.
+        """
+        result: dict = {}
 
-        # Merge each action frame on top (in order)
-        for action_frame in action_frames:
-            result = self._merge_layers(result, action_frame)
+        layer_bs = [f.get("blendshapes", {}) for f in layers]
+        merged = result["blendshapes"] = {}
+        for name, v in idle.get("blendshapes", {}).items():
+            for a_bs in layer_bs:
+                v = max(0.0, min(1.0, v + a_bs.get(name, 0.0)))
+            merged[name] = v
+        for k, a_bs in enumerate(layer_bs):
+            for name, v in a_bs.items():
+                if name in merged:
+                    continue
+                v = max(0.0, min(1.0, v))
+                for later in layer_bs[k + 1 :]:
+                    v = max(0.0, min(1.0, v + later.get(name, 0.0)))
+                merged[name] = v
 
+        i_bones = idle.get("bones", {})
+        layer_bones = [f.get("bones", {}) for f in layers]
+        if not i_bones and not any(layer_bones):
+            return result
+        bones = result["bones"] = {}
+        for k, src in enumerate([i_bones, *layer_bones]):
+            for name, data in src.items():
+                if name in bones:
+                    continue
+                rot = data.get("rot", _IDENTITY) if k == 0 else _IDENTITY
+                for a_bones in layer_bones if k == 0 else layer_bones[k - 1 :]:
+                    d = a_bones.get(name)
+                    ax, ay, az, aw = rot
+                    bx, by, bz, bw = (
+                        d.get("rot", _IDENTITY) if d is not None else _IDENTITY
+                    )
+                    x = aw * bx + ax * bw + ay * bz - az * by
+                    y = aw * by - ax * bz + ay * bw + az * bx
+                    z = aw * bz + ax * by - ay * bx + az * bw
+                    w = aw * bw - ax * bx - ay * by - az * bz
+                    mag = math.sqrt(x * x + y * y + z * z + w * w)
+                    rot = (
+                        (x / mag, y / mag, z / mag, w / mag)
+                        if mag >= 1e-10
+                        else _IDENTITY
+                    )
+                bones[name] = {"pos": [0.0, 0.0, 0.0], "rot": list(rot)}
         return result
 
     @staticmethod
-    def _merge_layers(idle: Optional[dict], action: Optional[dict]) -> Optional[dict]:
-        """Merge absolute idle + relative action delta."""
+    def _merge_layers(
+        idle: Optional[dict], action: Optional[dict], positions: bool = False
+    ) -> Optional[dict]:
+        """Merge absolute idle + relative action delta.
+
+        With *positions*, bone positions are merged as
+        idle_pos + rotate(idle_rot, action_pos) rather than zeroed.
+        """
         if not action:
             return idle
         if not idle:
@@ -650,46 +1088,79 @@ class VMCPlayer:
         # Blendshapes: clamp(idle + delta, 0, 1)
         i_bs = idle.get("blendshapes", {})
         a_bs = action.get("blendshapes", {})
-        result["blendshapes"] = {}
-        for name in set(i_bs) | set(a_bs):
-            result["blendshapes"][name] = max(
-                0.0, min(1.0, i_bs.get(name, 0.0) + a_bs.get(name, 0.0))
-            )
-
-        # Bones: only merge rotations (pos zeroed to prevent teleportation)
+        merged = result["blendshapes"] = {}
+        for name, v in i_bs.items():
+            merged[name] = max(0.0, min(1.0, v + a_bs.get(name, 0.0)))
+        for name, v in a_bs.items():
+            if name not in i_bs:
+                merged[name] = max(0.0, min(1.0, v))
+
+        # Bones: only merge rotations (pos zeroed to prevent teleportation).
+        # normalize(ir * dr) is inlined: this runs per bone on every tick.
         i_bones = idle.get("bones", {})
         a_bones = action.get("bones", {})
         if i_bones or a_bones:
-            result["bones"] = {}
-            for name in set(i_bones) | set(a_bones):
-                ir = i_bones.get(name, {}).get("rot", [0, 0, 0, 1])
-                dr = a_bones.get(name, {}).get("rot", [0, 0, 0, 1])
-                result["bones"][name] = {
-                    "pos": [0.0, 0.0, 0.0],
-                    "rot": _quat_normalize(_quat_multiply(ir, dr)),
+            bones = result["bones"] = {}
+            for name, ir, dr in _paired_rotations(i_bones, a_bones):
+                ax, ay, az, aw = ir
+                bx, by, bz, bw = dr
+                x = aw * bx + ax * bw + ay * bz - az * by
+                y = aw * by - ax * bz + ay * bw + az * bx
+                z = aw * bz + ax * by - ay * bx + az * bw
+                w = aw * bw - ax * bx - ay * by - az * bz
+                mag = math.sqrt(x * x + y * y + z * z + w * w)
+                pos = [0.0, 0.0, 0.0]
+                if positions:
+                    ip = i_bones.get(name, {}).get("pos", pos)
+                    dx, dy, dz = _quat_rotate_vec3(
+                        ir, a_bones.get(name, {}).get("pos", pos)
+                    )
+                    pos = [ip[0] + dx, ip[1] + dy, ip[2] + dz]
+                bones[name] = {
+                    "pos": pos,
+                    "rot": (
+                        [x / mag, y / mag, z / mag, w / mag]
+                        if mag >= 1e-10
+                        else _quat_identity()
+                    ),
                 }
         return result
 
     # ── Render loop ───────────────────────────────────────────────────
 
     def _render_loop(self):
-        """Main render loop at ~30 fps."""
-        idle_epoch = time.perf_counter()
-        interval = 1.0 / self.RENDER_FPS
+        """Main render loop at ~30 fps.
 
-        while self._running:
-            t0 = time.perf_counter()
+        Ticks are paced against absolute deadlines (epoch + k * interval)
+        so timing does not drift; if a tick overruns by more than a frame
+        the missed frames are dropped rather than sent in a burst.
+        """
+        interval_ns = 1_000_000_000 // self.RENDER_FPS
+        idle_epoch_ns = time.perf_counter_ns()
+        deadline_ns = idle_epoch_ns
+        seen_state = None
 
-            with self._lock:
-                if not self._idle_active and not self._active_actions:
-                    break
+        while self._running:
+            t0_ns = time.perf_counter_ns()
 
-                idle_frame = (
-                    self._get_idle_frame(t0 - idle_epoch)
-                    if self._idle_active and self._idle_frames
-                    else None
-                )
-                action_frames = self._get_active_action_frames()
+            state = self._state
+            if not state.idle_active and not state.actions:
+                break
+            if state is not seen_state:
+                # Forget cursors of idles/actions that were replaced
+                live = {id(state.idle_frames), *(id(a) for a in state.actions)}
+                self._cursors = {k: v for k, v in self._cursors.items() if k in live}
+                seen_state = state
+
+            idle_frame = (
+                self._get_idle_frame(state, (t0_ns - idle_epoch_ns) / 1e9)
+                if state.idle_active and state.idle_frames
+                else None
+            )
+            action_frames, expired = self._get_active_action_frames(state, t0_ns / 1e9)
+            if expired:
+                self._drop_actions(expired)
+                state = self._state
 
             merged = self._merge_multiple_actions(idle_frame, action_frames)
 
@@ -697,29 +1168,39 @@ class VMCPlayer:
                 # Zero blendshapes / reset bones that were set by previous
                 # actions but are no longer in the merged frame — prevents
                 # stale values lingering on VSeeFace after interruptions.
-                with self._lock:
-                    if self._dirty_blendshapes:
-                        bs = merged.get("blendshapes", {})
-                        for name in self._dirty_blendshapes:
-                            if name not in bs:
-                                bs[name] = 0.0
-                        merged["blendshapes"] = bs
-                    if self._dirty_bones:
-                        bones = merged.setdefault("bones", {})
-                        for name in self._dirty_bones:
-                            if name not in bones and name != "Hips":
-                                bones[name] = {"pos": [0, 0, 0], "rot": _quat_identity()}
-                    # Clear dirty tracking once ALL actions finish
-                    if not self._idle_active and not self._active_actions:
-                        self._dirty_blendshapes.clear()
-                        self._dirty_bones.clear()
+                # (Copies, since *merged* may be a stored idle frame.)
+                if state.dirty_bs:
+                    bs = dict(merged.get("blendshapes", {}))
+                    for name in state.dirty_bs:
+                        if name not in bs:
+                            bs[name] = 0.0
+                    merged = {**merged, "blendshapes": bs}
+                if state.dirty_bones:
+                    bones = dict(merged.get("bones", {}))
+                    for name in state.dirty_bones:
+                        if name not in bones and name != "Hips":
+                            bones[name] = {"pos": [0, 0, 0], "rot": _quat_identity()}
+                    merged = {**merged, "bones": bones}
+                # Clear dirty tracking once ALL actions finish
+                if not state.idle_active and not state.actions:
+                    with self._lock:
+                        # Re-check: a play that landed since the snapshot
+                        # has added dirty names that must survive
+                        current = self._state
+                        if not current.idle_active and not current.actions:
+                            self._state = replace(
+                                current, dirty_bs=frozenset(), dirty_bones=frozenset()
+                            )
 
                 has_bones = bool(merged.get("bones"))
                 self.sender.send_frame(merged, include_bones=has_bones)
 
-            dt = interval - (time.perf_counter() - t0)
-            if dt > 0:
-                time.sleep(dt)
+            deadline_ns += interval_ns
+            now_ns = time.perf_counter_ns()
+            if now_ns - deadline_ns > interval_ns:
+                deadline_ns = now_ns
+            if self._stop_event.wait(max(0, deadline_ns - now_ns) / 1e9):
+                break
 
         # Exiting — send neutral reset so VSeeFace doesn't freeze on
         # the last expression
@@ -735,6 +1216,9 @@ def convert_to_relative(frames: list[dict]) -> list[dict]:
     Blendshapes: delta = value - frame0_value
     Bone positions: delta = pos - frame0_pos
     Bone rotations: delta = inverse(frame0_rot) * rot
+
+    Bone rotations for the whole recording are packed into one
+    (frames, bones, 4) array and handed to a vmc_kernels kernel.
     """
     if not frames:
         return frames
@@ -743,28 +1227,52 @@ def convert_to_relative(frames: list[dict]) -> list[dict]:
     ref_bs = ref.get("blendshapes", {})
     ref_bones = ref.get("bones", {})
 
-    relative_frames = []
+    # Stable bone -> column mapping across the recording (frame-0 bones first)
+    bone_index: dict[str, int] = {name: i for i, name in enumerate(ref_bones)}
     for frame in frames:
+        for name in frame.get("bones", ()):
+            if name not in bone_index:
+                bone_index[name] = len(bone_index)
+
+    rel_rots: list = []
+    n_bones = len(bone_index)
+    if n_bones:
+        identity = _quat_identity()
+        flat = [identity] * (len(frames) * n_bones)
+        for f, frame in enumerate(frames):
+            base = f * n_bones
+            for name, data in frame.get("bones", {}).items():
+                flat[base + bone_index[name]] = data.get("rot", identity)
+        rots = np.array(flat, dtype=np.float64).reshape(len(frames), n_bones, 4)
+        # Missing bones default to identity, so rots[0] is the full reference
+        rel_rots = relative_rotations(rots, rots[0]).tolist()
+
+    relative_frames = []
+    for f, frame in enumerate(frames):
         rframe: dict = {"t": frame["t"]}
 
         # Blendshape deltas
         fbs = frame.get("blendshapes", {})
         delta_bs = {}
-        for name in set(fbs) | set(ref_bs):
-            delta_bs[name] = fbs.get(name, 0.0) - ref_bs.get(name, 0.0)
+        for name, v in fbs.items():
+            delta_bs[name] = v - ref_bs.get(name, 0.0)
+        for name, v in ref_bs.items():
+            if name not in fbs:
+                delta_bs[name] = 0.0 - v
         rframe["blendshapes"] = delta_bs
 
         # Bone deltas (rotation only — positions are zeroed to prevent teleportation)
         fbones = frame.get("bones", {})
         if fbones or ref_bones:
+            frame_rots = rel_rots[f]
             delta_bones = {}
-            for name in set(fbones) | set(ref_bones):
-                fr = fbones.get(name, {}).get("rot", [0, 0, 0, 1])
-                rr = ref_bones.get(name, {}).get("rot", [0, 0, 0, 1])
-                delta_bones[name] = {
-                    "pos": [0.0, 0.0, 0.0],
-                    "rot": _quat_normalize(_quat_multiply(_quat_inverse(rr), fr)),
-                }
+            for names in (fbones, ref_bones):
+                for name in names:
+                    if name not in delta_bones:
+                        delta_bones[name] = {
+                            "pos": [0.0, 0.0, 0.0],
+                            "rot": frame_rots[bone_index[name]],
+                        }
             rframe["bones"] = delta_bones
 
         relative_frames.append(rframe)
@@ -778,8 +1286,77 @@ def ensure_presets_dir():
     PRESETS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# fdatasync skips flushing metadata we don't need; not available on Windows
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """Write *data* to *path* atomically (temp file + fdatasync + rename).
+
+    Readers see either the old file or the complete new one — never a
+    half-written preset.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    # O_BINARY: without it Windows opens the fd in text mode and mangles \n
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(tmp, flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+        _fdatasync(fd)
+    except BaseException:
+        os.close(fd)
+        tmp.unlink(missing_ok=True)
+        raise
+    os.close(fd)
+    os.replace(tmp, path)
+
+
+# Presets are stored as zstd-compressed JSON; plain .json files from older
+# versions are still read (and replaced on the next save)
+PRESET_SUFFIX = ".json.zst"
+LEGACY_PRESET_SUFFIX = ".json"
+ZSTD_LEVEL = 3
+
+
+# Bone quantization applied on save: rotations to 1e-5 (finer than an int16
+# quaternion grid), positions to 0.1 mm.  Short, repeating decimals let
+# zstd collapse near-static bones across frames.
+ROT_DECIMALS = 5
+POS_DECIMALS = 4
+
+
+def _quantize_bones(frames: list[dict]) -> list[dict]:
+    """Return frames with bone pos/rot rounded for storage (input untouched)."""
+    out = []
+    for frame in frames:
+        bones = frame.get("bones")
+        if bones:
+            frame = dict(frame)
+            qbones = {}
+            for name, data in bones.items():
+                pos = data.get("pos", (0, 0, 0))
+                rot = data.get("rot", (0, 0, 0, 1))
+                qbones[name] = {
+                    **data,
+                    "pos": [round(float(v), POS_DECIMALS) for v in pos],
+                    "rot": [round(float(v), ROT_DECIMALS) for v in rot],
+                }
+            frame["bones"] = qbones
+        out.append(frame)
+    return out
+
+
+def _preset_name_from_path(path: Path) -> str:
+    for suffix in (PRESET_SUFFIX, LEGACY_PRESET_SUFFIX):
+        if path.name.endswith(suffix):
+            return path.name[: -len(suffix)]
+    return path.stem
+
+
 def save_preset(name: str, frames: list[dict], mode: str = "absolute") -> Path:
-    """Save frames to a JSON preset file.
+    """Save frames to a compressed JSON preset file.
 
     mode: 'absolute' for recorded animations (idle-capable),
           'relative' for synthetic delta animations (actions only).
@@ -791,47 +1368,215 @@ def save_preset(name: str, frames: list[dict], mode: str = "absolute") -> Path:
         "mode": mode,
         "duration_ms": duration_ms,
         "frame_count": len(frames),
-        "frames": frames,
+        "frames": _quantize_bones(frames),
     }
-    path = PRESETS_DIR / f"{name}.json"
-    path.write_text(json.dumps(preset, ensure_ascii=False, indent=2), encoding="utf-8")
+    path = PRESETS_DIR / f"{name}{PRESET_SUFFIX}"
+    cctx = zstd.ZstdCompressor(level=ZSTD_LEVEL)
+    _atomic_write_bytes(path, cctx.compress(orjson.dumps(preset)))
+    (PRESETS_DIR / f"{name}{LEGACY_PRESET_SUFFIX}").unlink(missing_ok=True)
+    # Don't rely on the mtime key alone: coarse-mtime filesystems can give
+    # a quick re-record the same timestamp as the file it replaces.
+    _relative_cache_path(name).unlink(missing_ok=True)
+    with _relative_frames_lock:
+        _relative_frames_cache.pop(name, None)
+    _invalidate_index()
     log.info(f"Preset saved: {path} ({len(frames)} frames, {duration_ms}ms)")
     return path
 
 
+def load_preset_path(name: str) -> Path:
+    """Resolve a preset name to its file on disk (raises if missing)."""
+    for suffix in (PRESET_SUFFIX, LEGACY_PRESET_SUFFIX):
+        path = PRESETS_DIR / f"{name}{suffix}"
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"Preset not found: {name}")
+
+
+def read_preset_bytes(path: Path) -> bytes:
+    """Return a preset file's JSON bytes, decompressing if needed."""
+    data = path.read_bytes()
+    if path.name.endswith(PRESET_SUFFIX):
+        return zstd.ZstdDecompressor().decompress(data)
+    return data
+
+
 def load_preset(name: str) -> dict:
     """Load a preset by name."""
-    path = PRESETS_DIR / f"{name}.json"
-    if not path.exists():
-        raise FileNotFoundError(f"Preset not found: {name}")
-    return json.loads(path.read_text(encoding="utf-8"))
+    return orjson.loads(read_preset_bytes(load_preset_path(name)))
+
+
+def _relative_cache_path(name: str) -> Path:
+    return PRESETS_CACHE_DIR / f"{name}.rel.json"
+
+
+# name -> (source path, source mtime_ns, relative frames) for recently
+# played presets.  The frames are shared between callers; treat them as
+# read-only (the player only ever reads them).
+_relative_frames_cache: dict[str, tuple[Path, int, list[dict]]] = {}
+_RELATIVE_FRAMES_CACHE_SIZE = 32
+_relative_frames_lock = threading.Lock()
+
+
+def load_preset_relative(name: str) -> list[dict]:
+    """Load a preset's frames as relative deltas (ready for the action layer).
+
+    Absolute presets are converted with convert_to_relative() once; the
+    result is cached on disk keyed by the source file's mtime so repeat
+    plays are a plain file read.  Recently loaded presets are also kept
+    in memory under the same key, so replaying one costs a single stat().
+    """
+    path = load_preset_path(name)
+    mtime_ns = path.stat().st_mtime_ns
+    with _relative_frames_lock:
+        hit = _relative_frames_cache.get(name)
+        if hit is not None and hit[0] == path and hit[1] == mtime_ns:
+            # Re-insert so eviction order is least recently used
+            del _relative_frames_cache[name]
+            _relative_frames_cache[name] = hit
+            return hit[2]
+
+    frames = _read_relative_frames(name, path, mtime_ns)
+    with _relative_frames_lock:
+        _relative_frames_cache.pop(name, None)
+        if len(_relative_frames_cache) >= _RELATIVE_FRAMES_CACHE_SIZE:
+            # Dicts keep insertion order: drop the least recently used
+            _relative_frames_cache.pop(next(iter(_relative_frames_cache)), None)
+        _relative_frames_cache[name] = (path, mtime_ns, frames)
+    return frames
+
+
+def _read_relative_frames(name: str, path: Path, mtime_ns: int) -> list[dict]:
+    cache_path = _relative_cache_path(name)
+
+    if cache_path.exists():
+        try:
+            cached = orjson.loads(cache_path.read_bytes())
+            if cached.get("source_mtime_ns") == mtime_ns:
+                return cached["frames"]
+        except (orjson.JSONDecodeError, KeyError):
+            pass
+
+    preset = orjson.loads(read_preset_bytes(path))
+    frames = preset["frames"]
+    if preset.get("mode", "absolute") != "absolute":
+        return frames
+
+    frames = convert_to_relative(frames)
+    try:
+        PRESETS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _atomic_write_bytes(
+            cache_path,
+            orjson.dumps({"source_mtime_ns": mtime_ns, "frames": frames}),
+        )
+    except OSError as e:
+        log.warning(f"Could not cache relative frames for {name}: {e}")
+    return frames
+
+
+# (presets dir mtime_ns, metadata list) — rebuilt only when the dir changes
+_index_cache: Optional[tuple[int, list[dict]]] = None
+
+# Persisted metadata per preset file: {filename: [mtime_ns, size, meta]}.
+# Lets list_presets skip re-reading unchanged files after a restart.
+_INDEX_PATH = PRESETS_CACHE_DIR / "index.json"
+
+# save_preset writes the metadata fields before "frames", so they fit here
+_HEADER_READ_BYTES = 4096
+
+
+def _invalidate_index():
+    """Drop the cached preset listing (call after writing/removing a preset)."""
+    global _index_cache
+    _index_cache = None
+
+
+def _read_preset_header(path: Path) -> dict:
+    """Read a preset's metadata without decoding its frames.
+
+    Falls back to a full parse for files that don't start with the header
+    fields (e.g. hand-edited presets).
+    """
+    with path.open("rb") as f:
+        if path.name.endswith(PRESET_SUFFIX):
+            with zstd.ZstdDecompressor().stream_reader(f) as reader:
+                head = reader.read(_HEADER_READ_BYTES)
+        else:
+            head = f.read(_HEADER_READ_BYTES)
+    cut = head.find(b'"frames"')
+    if cut != -1:
+        try:
+            return orjson.loads(head[:cut].rstrip().rstrip(b",") + b"}")
+        except orjson.JSONDecodeError:
+            pass
+    return orjson.loads(read_preset_bytes(path))
 
 
 def list_presets() -> list[dict]:
     """List all available presets (name, duration, frame count, mode)."""
+    global _index_cache
     ensure_presets_dir()
+    stamp = PRESETS_DIR.stat().st_mtime_ns
+    if _index_cache is not None and _index_cache[0] == stamp:
+        return list(_index_cache[1])
+
+    # One file per name; compressed files win over leftover legacy ones
+    paths: dict[str, Path] = {}
+    for p in PRESETS_DIR.glob(f"*{LEGACY_PRESET_SUFFIX}"):
+        paths[_preset_name_from_path(p)] = p
+    for p in PRESETS_DIR.glob(f"*{PRESET_SUFFIX}"):
+        paths[_preset_name_from_path(p)] = p
+
+    try:
+        stored = orjson.loads(_INDEX_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        stored = {}
+
+    index: dict[str, list] = {}
     presets = []
-    for p in sorted(PRESETS_DIR.glob("*.json")):
+    for stem, p in sorted(paths.items()):
         try:
-            data = json.loads(p.read_text(encoding="utf-8"))
-            presets.append({
-                "name": data.get("name", p.stem),
-                "duration_ms": data.get("duration_ms", 0),
-                "frame_count": data.get("frame_count", 0),
-                "mode": data.get("mode", "absolute"),
-            })
-        except (json.JSONDecodeError, KeyError):
+            st = p.stat()
+            entry = stored.get(p.name)
+            if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                meta = entry[2]
+            else:
+                data = _read_preset_header(p)
+                meta = {
+                    "name": data.get("name", stem),
+                    "duration_ms": data.get("duration_ms", 0),
+                    "frame_count": data.get("frame_count", 0),
+                    "mode": data.get("mode", "absolute"),
+                }
+        except (OSError, orjson.JSONDecodeError, KeyError, zstd.ZstdError):
             continue
-    return presets
+        index[p.name] = [st.st_mtime_ns, st.st_size, meta]
+        presets.append(meta)
+
+    if index != stored:
+        try:
+            PRESETS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _atomic_write_bytes(_INDEX_PATH, orjson.dumps(index))
+        except OSError as e:
+            log.warning(f"Could not write preset index: {e}")
+    _index_cache = (stamp, presets)
+    return list(presets)
 
 
 def delete_preset(name: str) -> bool:
-    """Delete a preset file."""
-    path = PRESETS_DIR / f"{name}.json"
-    if path.exists():
-        path.unlink()
-        return True
-    return False
+    """Delete a preset file (and any cached derived data)."""
+    deleted = False
+    for suffix in (PRESET_SUFFIX, LEGACY_PRESET_SUFFIX):
+        path = PRESETS_DIR / f"{name}{suffix}"
+        if path.exists():
+            path.unlink()
+            deleted = True
+    if deleted:
+        _relative_cache_path(name).unlink(missing_ok=True)
+        with _relative_frames_lock:
+            _relative_frames_cache.pop(name, None)
+        _invalidate_index()
+    return deleted
 
 
 # ── Singleton instances ──────────────────────────────────────────────────
@@ -7,8 +7,18 @@ detected emotions to VMC animation presets for the VRM avatar.
 
 import re
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 
+try:
+    import hyperscan
+
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
 log = logging.getLogger(__name__)
 
 # ── Emotion keyword patterns ─────────────────────────────────────────────
@@ -52,11 +62,156 @@ EMOTION_PATTERNS: dict[str, list[str]] = {
     ],
 }
 
-# Compile patterns once at import time
-_COMPILED: dict[str, list[re.Pattern]] = {
-    emotion: [re.compile(p, re.IGNORECASE) for p in patterns]
-    for emotion, patterns in EMOTION_PATTERNS.items()
-}
+# Pattern ids (positions in this flat table) index into _PATTERN_EMOTIONS,
+# which holds each pattern's emotion index into _EMOTIONS; both the regex
+# and the Hyperscan scanner report matches by pattern id.
+_EMOTIONS: tuple[str, ...] = tuple(EMOTION_PATTERNS)
+_PATTERNS: list[str] = [p for ps in EMOTION_PATTERNS.values() for p in ps]
+_PATTERN_EMOTIONS: list[int] = [
+    i for i, patterns in enumerate(EMOTION_PATTERNS.values()) for _ in patterns
+]
+
+# Compile patterns once at import time.  Patterns are lowercase and are
+# matched against lowercased text (see detect_emotion), so no IGNORECASE;
+# ASCII keeps \b on sre's fast path and matches Hyperscan's word boundary.
+_REGEX_FLAGS = re.ASCII
+_COMPILED: list[re.Pattern] = [re.compile(p, _REGEX_FLAGS) for p in _PATTERNS]
+
+
+def _first_letter(pattern: str) -> Optional[str]:
+    """The literal letter a pattern's match must start with, if obvious."""
+    m = re.match(r"\\b([a-z])(?![?*+{])", pattern, re.IGNORECASE)
+    if m is None:
+        return None
+    # A top-level "|" means the match need not start with this letter
+    top_level = pattern
+    while True:
+        stripped = re.sub(r"\([^()]*\)", "", top_level)
+        if stripped == top_level:
+            break
+        top_level = stripped
+    return None if "|" in top_level else m.group(1).lower()
+
+
+def _build_master(patterns: list[str]) -> tuple[re.Pattern, list[int]]:
+    """One regex matching any of *patterns*, each in its own group.
+
+    Patterns starting with \\b and a letter are grouped under that letter
+    (``\\bh(?:(appy\\b)|(aha\\b))|...``), so at each position the engine
+    compares one character per letter instead of trying every pattern.
+    The patterns only use non-capturing groups; the returned list maps
+    each match's ``lastindex - 1`` back to a pattern id.
+    """
+    by_letter: dict[str, list[int]] = {}
+    other: list[int] = []
+    for i, p in enumerate(patterns):
+        letter = _first_letter(p)
+        if letter:
+            by_letter.setdefault(letter, []).append(i)
+        else:
+            other.append(i)
+
+    branches = []
+    group_ids: list[int] = []
+    for letter, ids in by_letter.items():
+        body = "|".join(f"({patterns[i][3:]})" for i in ids)
+        branches.append(rf"\b{letter}(?:{body})")
+        group_ids.extend(ids)
+    for i in other:
+        branches.append(f"({patterns[i]})")
+        group_ids.append(i)
+    return re.compile("|".join(branches), _REGEX_FLAGS), group_ids
+
+
+_MASTER, _MASTER_GROUP_IDS = _build_master(_PATTERNS)
+
+# For each pattern id, the other patterns that can match at the same
+# position (same first letter, or a first letter we could not tell)
+_SAME_START: list[tuple[int, ...]] = [
+    tuple(
+        j
+        for j, other in enumerate(_PATTERNS)
+        if j != i
+        and (
+            _first_letter(p) is None or _first_letter(other) in (None, _first_letter(p))
+        )
+    )
+    for i, p in enumerate(_PATTERNS)
+]
+
+
+def _regex_scores(text: str) -> list[int]:
+    """Per-emotion count of distinct patterns matching *text*, via _MASTER.
+
+    Counts are indexed like _EMOTIONS; *text* must already be lowercased.
+
+    The scan resumes one character after each match start, so keywords
+    overlapping an earlier match are still seen.  The master regex only
+    reports one pattern per position, so the patterns that could also
+    match there are checked individually; the counts are the same as
+    searching each pattern separately.
+    """
+    found: set[int] = set()
+    pos = 0
+    while len(found) < len(_PATTERNS):
+        m = _MASTER.search(text, pos)
+        if m is None:
+            break
+        start = m.start()
+        first = _MASTER_GROUP_IDS[m.lastindex - 1]
+        found.add(first)
+        for i in _SAME_START[first]:
+            if i not in found and _COMPILED[i].match(text, start):
+                found.add(i)
+        pos = start + 1
+
+    scores = [0] * len(_EMOTIONS)
+    for pattern_id in found:
+        scores[_PATTERN_EMOTIONS[pattern_id]] += 1
+    return scores
+
+
+# Hyperscan: every pattern in one database, compiled to a single
+# automaton (used instead of _MASTER when the library is installed).
+def _build_hyperscan_db():
+    expressions = [p.encode() for p in _PATTERNS]
+    # SINGLEMATCH: a pattern scores once no matter how often it occurs.
+    # Hyperscan has no Unicode \b; word boundaries are ASCII-only, as in
+    # the re fallback.
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+    db = hyperscan.Database()
+    db.compile(
+        expressions=expressions,
+        ids=list(range(len(expressions))),
+        flags=[flags] * len(expressions),
+    )
+    return db
+
+
+_HS_DB = None
+if HYPERSCAN_AVAILABLE:
+    try:
+        _HS_DB = _build_hyperscan_db()
+    except Exception as e:
+        log.warning(f"Hyperscan unavailable for emotion patterns, using re: {e}")
+
+# Hyperscan scratch space is not thread-safe — one per thread
+_hs_local = threading.local()
+
+
+def _hyperscan_scores(text: str) -> list[int]:
+    scratch = getattr(_hs_local, "scratch", None)
+    if scratch is None:
+        scratch = _hs_local.scratch = hyperscan.Scratch(_HS_DB)
+
+    scores = [0] * len(_EMOTIONS)
+
+    def on_match(pattern_id, start, end, flags, context):
+        scores[_PATTERN_EMOTIONS[pattern_id]] += 1
+
+    _HS_DB.scan(text.encode("utf-8"), match_event_handler=on_match, scratch=scratch)
+    return scores
+
 
 # Default emotion → VMC preset name mapping
 EMOTION_PRESET_MAP: dict[str, str] = {
@@ -73,28 +228,42 @@ EMOTION_PRESET_MAP: dict[str, str] = {
 MIN_SCORE = 2
 
 
-def detect_emotion(text: str, min_score: int = MIN_SCORE) -> Optional[str]:
-    """
-    Detect the dominant emotion in text using keyword matching.
+# Longer texts are scored directly rather than kept in the LRU cache
+_CACHE_MAX_TEXT_LEN = 4096
 
-    Returns the emotion name (e.g. "joy", "agree") or None if no
-    strong signal is found.
-    """
-    scores: dict[str, int] = {}
 
-    for emotion, patterns in _COMPILED.items():
-        score = sum(1 for p in patterns if p.search(text))
-        if score > 0:
-            scores[emotion] = score
+def _score_emotion(text: str, min_score: int) -> Optional[str]:
+    if _HS_DB is not None:
+        scores = _hyperscan_scores(text)
+    else:
+        scores = _regex_scores(text)
 
-    if not scores:
+    # index() of the max picks the first emotion on ties
+    best = max(scores)
+    if best == 0 or best < min_score:
         return None
 
-    best = max(scores, key=lambda k: scores[k])
-    if scores[best] < min_score:
-        return None
+    return _EMOTIONS[scores.index(best)]
+
+
+@lru_cache(maxsize=1024)
+def _detect_emotion_cached(text: str, min_score: int) -> Optional[str]:
+    return _score_emotion(text, min_score)
+
+
+def detect_emotion(text: str, min_score: int = MIN_SCORE) -> Optional[str]:
+    """
+    Detect the dominant emotion in text using keyword matching.
 
-    return best
+    Returns the emotion name (e.g. "joy", "agree") or None if no
+    strong signal is found.  Results for repeated texts are served
+    from an LRU cache keyed on the normalized text.
+    """
+    # Patterns are case-insensitive, so normalizing case only improves hit rate
+    key = text.strip().lower()
+    if len(key) > _CACHE_MAX_TEXT_LEN:
+        return _score_emotion(key, min_score)
+    return _detect_emotion_cached(key, min_score)
 
 
 def get_preset_for_emotion(emotion: str) -> Optional[str]:
@@ -118,12 +287,9 @@ def trigger_animation(text: str, min_score: int = MIN_SCORE) -> Optional[str]:
         return None
 
     try:
-        from open_webui.utils.vmc import get_player, load_preset, convert_to_relative
+        from open_webui.utils.vmc import get_player, load_preset_relative
 
-        preset = load_preset(preset_name)
-        frames = preset["frames"]
-        if preset.get("mode", "absolute") == "absolute":
-            frames = convert_to_relative(frames)
+        frames = load_preset_relative(preset_name)
         player = get_player()
         player.play(frames, loop=False)
         log.info(f"VMC animation triggered: {preset_name} (emotion: {emotion})")
@@ -136,6 +302,32 @@ def trigger_animation(text: str, min_score: int = MIN_SCORE) -> Optional[str]:
         return None
 
 
+# Sync filter outlets run on the event loop, so the filter hands the work
+# to one background worker instead of detecting/loading/sending inline.
+# At most _MAX_PENDING_TRIGGERS run or wait; further bursts are dropped.
+_MAX_PENDING_TRIGGERS = 4
+_trigger_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vmc-emotion")
+_trigger_slots = threading.BoundedSemaphore(_MAX_PENDING_TRIGGERS)
+
+
+def trigger_animation_async(text: str, min_score: int = MIN_SCORE) -> bool:
+    """
+    Queue trigger_animation() on a background worker and return at once.
+
+    Returns False if the trigger was dropped because the queue is full.
+    """
+    if not _trigger_slots.acquire(blocking=False):
+        log.debug("VMC emotion trigger dropped: queue full")
+        return False
+    try:
+        future = _trigger_executor.submit(trigger_animation, text, min_score)
+    except RuntimeError:  # interpreter shutting down
+        _trigger_slots.release()
+        return False
+    future.add_done_callback(lambda _: _trigger_slots.release())
+    return True
+
+
 # ── Filter function content (to be stored in the Functions DB) ───────────
 
 FILTER_ID = "vmc_emotion_trigger"
@@ -145,7 +337,7 @@ FILTER_CONTENT = '''\
 title: VMC Emotion Trigger
 description: Detects emotions in LLM responses and triggers VRM avatar animations via VMC protocol.
 author: Agent
-version: 0.1.0
+version: 0.2.0
 """
 
 from pydantic import BaseModel
@@ -183,8 +375,8 @@ class Filter:
             return body
 
         try:
-            from open_webui.utils.vmc_emotion import trigger_animation
-            trigger_animation(text, min_score=self.valves.min_score)
+            from open_webui.utils.vmc_emotion import trigger_animation_async
+            trigger_animation_async(text, min_score=self.valves.min_score)
         except Exception as e:
             print(f"VMC emotion trigger error: {e}")
 
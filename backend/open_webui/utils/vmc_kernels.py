@@ -0,0 +1,125 @@
+"""
+Numeric kernels for VMC frame processing.
+
+Kernels take packed quaternion arrays ([x, y, z, w] on the last axis) and
+leave dict <-> array marshaling to the callers in ``utils.vmc``.  When numba
+is installed they are JIT-compiled; otherwise the NumPy versions are used.
+"""
+
+import logging
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
+_IDENTITY = (0.0, 0.0, 0.0, 1.0)
+
+
+# ── NumPy implementations ────────────────────────────────────────────────
+
+
+def _quat_multiply_np(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Batched Hamilton product over the last axis: a * b. Format [x, y, z, w]."""
+    ax, ay, az, aw = np.moveaxis(a, -1, 0)
+    bx, by, bz, bw = np.moveaxis(b, -1, 0)
+    return np.stack(
+        [
+            aw * bx + ax * bw + ay * bz - az * by,
+            aw * by - ax * bz + ay * bw + az * bx,
+            aw * bz + ax * by - ay * bx + az * bw,
+            aw * bw - ax * bx - ay * by - az * bz,
+        ],
+        axis=-1,
+    )
+
+
+def _quat_normalize_np(q: np.ndarray) -> np.ndarray:
+    """Batched quaternion normalize over the last axis (degenerate -> identity)."""
+    mag = np.linalg.norm(q, axis=-1, keepdims=True)
+    degenerate = mag[..., 0] < 1e-10
+    out = q / np.where(mag < 1e-10, 1.0, mag)
+    out[degenerate] = _IDENTITY
+    return out
+
+
+def _relative_rotations_np(rots: np.ndarray, ref: np.ndarray) -> np.ndarray:
+    ref_inv = ref * np.array([-1.0, -1.0, -1.0, 1.0])
+    return _quat_normalize_np(_quat_multiply_np(ref_inv, rots))
+
+
+def _quat_mul_norm_py(ax, ay, az, aw, bx, by, bz, bw):
+    """normalize(a * b) on scalar components, returned as an (x, y, z, w) tuple."""
+    x = aw * bx + ax * bw + ay * bz - az * by
+    y = aw * by - ax * bz + ay * bw + az * bx
+    z = aw * bz + ax * by - ay * bx + az * bw
+    w = aw * bw - ax * bx - ay * by - az * bz
+    mag = math.sqrt(x * x + y * y + z * z + w * w)
+    if mag < 1e-10:
+        return _IDENTITY
+    return x / mag, y / mag, z / mag, w / mag
+
+
+# ── Numba implementations ────────────────────────────────────────────────
+
+if NUMBA_AVAILABLE:
+    # Fused multiply + normalize; inlined into the JIT loops below so the
+    # intermediate product never leaves registers.
+    _quat_mul_norm_jit = njit(cache=True, fastmath=True, inline="always")(
+        _quat_mul_norm_py
+    )
+
+    # Serial on purpose: callers run on several threads (request threadpool,
+    # emotion worker, startup warmup) and numba's parallel threading layers
+    # are either not thread-safe or hang shutdown when used off the main
+    # thread.  Each preset is converted once and cached, so prange bought
+    # little anyway.
+    @njit(cache=True, fastmath=True)
+    def _relative_rotations_jit(rots, ref, out):
+        n_frames, n_bones = rots.shape[0], rots.shape[1]
+        for f in range(n_frames):
+            for b in range(n_bones):
+                # inverse(ref) of a unit quaternion is its conjugate
+                x, y, z, w = _quat_mul_norm_jit(
+                    -ref[b, 0],
+                    -ref[b, 1],
+                    -ref[b, 2],
+                    ref[b, 3],
+                    rots[f, b, 0],
+                    rots[f, b, 1],
+                    rots[f, b, 2],
+                    rots[f, b, 3],
+                )
+                out[f, b, 0] = x
+                out[f, b, 1] = y
+                out[f, b, 2] = z
+                out[f, b, 3] = w
+
+
+# ── Public kernels ───────────────────────────────────────────────────────
+
+
+def relative_rotations(rots: np.ndarray, ref: np.ndarray) -> np.ndarray:
+    """normalize(inverse(ref[b]) * rots[f, b]) for a (frames, bones, 4) array."""
+    if NUMBA_AVAILABLE:
+        out = np.empty_like(rots)
+        _relative_rotations_jit(rots, ref, out)
+        return out
+    return _relative_rotations_np(rots, ref)
+
+
+def warmup():
+    """Compile (or load from cache) the JIT kernels so first use is fast."""
+    if not NUMBA_AVAILABLE:
+        return
+    rots = np.zeros((2, 1, 4), dtype=np.float64)
+    rots[..., 3] = 1.0
+    relative_rotations(rots, rots[0])
+    log.info("VMC numba kernels ready")